@@ -1,11 +1,18 @@
 import os
-import pickle
+import time
 from pathlib import Path
 from flask import Flask, request, render_template, jsonify, redirect, url_for
 import pandas as pd
 
+from src import artifact
+from src.monitoring import DriftMonitor
+from src.logger import logging
+
 app = Flask(__name__, template_folder="templates")
 
+# per-request records are sampled, see LOG_SAMPLE_RATE in src/logger.py
+request_logger = logging.getLogger("request")
+
 # ============================================================
 #               🔹 MODEL / PREPROCESSOR LOADER
 # ============================================================
@@ -13,6 +20,11 @@ app = Flask(__name__, template_folder="templates")
 # Tell Flask where to find model & preprocessor files
 MODEL_DIR = Path(os.getenv("MODEL_DIR", "artifacts")).resolve()
 
+# "r" maps out-of-band NumPy arrays (e.g. linear coef_) read-only from the page
+# cache, shared by all workers. Tree ensembles, XGBoost and CatBoost copy their
+# data on load, so for those it changes nothing (see src/artifact.py)
+MMAP_MODE = os.getenv("ARTIFACT_MMAP_MODE", "r") or None
+
 MODEL_CANDIDATES = [
     MODEL_DIR / "model_trainer.pkl",
 ]
@@ -29,8 +41,7 @@ load_messages = []
 
 
 def _load_pickle(p: Path):
-    with p.open("rb") as f:
-        return pickle.load(f)
+    return artifact.load_any(p, mmap_mode=MMAP_MODE)
 
 
 def try_load():
@@ -82,6 +93,24 @@ FEATURES = [
     "writing_score",
 ]
 
+# Input drift monitoring against the profile written at training time
+PROFILE_PATH = MODEL_DIR / "reference_profile.json"
+MONITOR_DIR = Path(os.getenv("MONITOR_DIR", "monitoring")).resolve()
+
+monitor = None
+if PROFILE_PATH.exists():
+    try:
+        monitor = DriftMonitor.from_file(
+            PROFILE_PATH,
+            FEATURES,
+            MONITOR_DIR,
+            flush_interval=float(os.getenv("MONITOR_FLUSH_SECONDS", 30)),
+            retention=float(os.getenv("MONITOR_RETENTION_SECONDS", 86400)),
+        )
+        load_messages.append(f"Loaded reference profile: {PROFILE_PATH}")
+    except Exception as e:
+        load_messages.append(f"Failed to load reference profile from {PROFILE_PATH}: {e}")
+
 
 def predict_rows(rows):
     """Run model prediction."""
@@ -91,6 +120,11 @@ def predict_rows(rows):
             + " | ".join(load_messages or ["No model/preprocessor files found."])
         )
 
+    start = time.perf_counter()
+    # counted before transform so rows the encoder rejects still show up
+    if monitor is not None:
+        monitor.observe(rows)
+
     df = pd.DataFrame(rows, columns=FEATURES)
 
     if pipeline is not None:
@@ -99,6 +133,13 @@ def predict_rows(rows):
         X = preproc.transform(df) if preproc is not None else df
         y = model.predict(X)
 
+    if monitor is not None:
+        monitor.observe_predictions(y)
+
+    request_logger.info(
+        "predict",
+        extra={"rows": len(rows), "latency_ms": round((time.perf_counter() - start) * 1000, 3)},
+    )
     return [float(v) for v in y]
 
 
@@ -145,6 +186,7 @@ def predict_datapoint():
         try:
             return jsonify(predictions=predict_rows(rows))
         except Exception as e:
+            request_logger.exception("prediction failed")
             return jsonify(error=str(e), details=load_messages), 500
 
     # --- FORM POST (from home.html) ---
@@ -171,6 +213,7 @@ def predict_datapoint():
         debug = "<br>".join(load_messages) if load_messages else ""
         return render_template("home.html", results=pretty, debug=debug)
     except Exception as e:
+        request_logger.exception("prediction failed")
         debug = "<br>".join(load_messages) if load_messages else ""
         return render_template("home.html", results=f"Error: {e}", debug=debug)
 
@@ -204,9 +247,18 @@ def api_predict():
     try:
         return jsonify(predictions=predict_rows(rows))
     except Exception as e:
+        request_logger.exception("prediction failed")
         return jsonify(error=str(e), details=load_messages), 500
 
 
+@app.route("/monitoring/drift", methods=["GET"])
+def monitoring_drift():
+    """Input and prediction drift merged over all workers."""
+    if monitor is None:
+        return jsonify(error="No reference profile loaded.", details=load_messages), 404
+    return jsonify(monitor.report())
+
+
 # ============================================================
 #                      🔹 ENTRY POINT
 # ============================================================
@@ -0,0 +1,85 @@
+"""
+Load-time benchmark: plain pickle vs the artifact format.
+
+    python -m benchmarks.bench_artifact [artifact.pkl ...]
+
+Every given file (default: the .pkl files in artifacts/) is loaded once,
+re-written in each format to a temporary directory and then loaded
+repeatedly; the best of N runs is reported.
+"""
+import glob
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from src import artifact
+
+REPEAT = 20
+
+
+def best_of(fn, repeat=REPEAT):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def available_codecs():
+    codecs = ["zlib"]
+    if artifact.lz4_frame is not None:
+        codecs.append("lz4")
+    if artifact.zstandard is not None:
+        codecs.append("zstd")
+    return codecs
+
+
+def bench_file(path, tmp_dir):
+    obj = artifact.load_any(path)
+    name = os.path.basename(path)
+
+    legacy = os.path.join(tmp_dir, "legacy-" + name)
+    with open(legacy, "wb") as f:
+        pickle.dump(obj, f)
+
+    def load_legacy():
+        with open(legacy, "rb") as f:
+            pickle.load(f)
+
+    cases = [("pickle.load (current)", legacy, load_legacy)]
+
+    raw = os.path.join(tmp_dir, "none-" + name)
+    artifact.dump(obj, raw)
+    cases.append(("artifact", raw, lambda: artifact.load(raw)))
+    cases.append(("artifact mmap='r'", raw, lambda: artifact.load(raw, mmap_mode="r")))
+    cases.append(("artifact mmap='r' no verify", raw,
+                  lambda: artifact.load(raw, mmap_mode="r", verify=False)))
+
+    for codec in available_codecs():
+        out = os.path.join(tmp_dir, codec + "-" + name)
+        artifact.dump(obj, out, compress=codec)
+        cases.append((f"artifact {codec}", out, lambda out=out: artifact.load(out)))
+
+    buffers = artifact.inspect(raw)["buffers"]
+    oob = sum(b["raw_length"] for b in buffers) / 1024
+    print(f"\n{name} ({type(obj).__name__})")
+    # with no out-of-band buffers mmap cannot share anything for this model
+    print(f"  out-of-band buffers: {len(buffers)} ({oob:.1f} KiB mmap-able)")
+    print(f"  {'format':<30}{'size (KiB)':>12}{'load (ms)':>12}")
+    for label, file_path, fn in cases:
+        size = os.path.getsize(file_path) / 1024
+        print(f"  {label:<30}{size:>12.1f}{best_of(fn) * 1000:>12.3f}")
+
+
+def main(paths):
+    paths = paths or sorted(glob.glob(os.path.join("artifacts", "*.pkl")))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for path in paths:
+            bench_file(path, tmp_dir)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
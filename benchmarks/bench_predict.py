@@ -0,0 +1,94 @@
+"""
+Latency benchmark for app.predict_rows and the cost of request logging
+and drift monitoring.
+
+    python -m benchmarks.bench_predict [iterations]
+
+Needs a trained model in MODEL_DIR (run the training pipeline first).
+Each case runs predict_rows on single rows from artifacts/test_data.csv and
+reports mean / p50 / p99 latency.
+"""
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import app
+from src import logger
+
+ITERATIONS = 2000
+
+
+def sample_rows(n):
+    df = pd.read_csv(os.path.join("artifacts", "test_data.csv"))
+    rows = df[app.FEATURES].values.tolist()
+    return [rows[i % len(rows)] for i in range(n)]
+
+
+def run(rows):
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        app.predict_rows([row])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return (
+        statistics.fmean(timings),
+        timings[len(timings) // 2],
+        timings[int(len(timings) * 0.99)],
+    )
+
+
+def main(iterations):
+    if app.pipeline is None and app.model is None:
+        sys.exit("No model loaded: " + " | ".join(app.load_messages))
+
+    rows = sample_rows(iterations)
+    root = logging.getLogger()
+    sampler = next(f for f in app.request_logger.filters if isinstance(f, logger.SamplingFilter))
+    sample_rate = sampler.rate
+    app.predict_rows(rows[:10])  # warm up
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sync_handler = logging.FileHandler(os.path.join(tmp_dir, "sync.log"))
+        sync_handler.setFormatter(logger.JsonFormatter())
+
+        cases = [
+            ("logging disabled", None, None),
+            (f"async queue, sample={sample_rate}", logger.queue_handler, sample_rate),
+            ("async queue, sample=1.0", logger.queue_handler, 1.0),
+            ("sync FileHandler, sample=1.0", sync_handler, 1.0),
+        ]
+
+        print(f"predict_rows, {iterations} single-row calls")
+        print(f"  {'case':<52}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        try:
+            for label, handler, rate in cases:
+                root.handlers = [handler] if handler is not None else []
+                app.request_logger.disabled = handler is None
+                sampler.rate = rate if rate is not None else sample_rate
+                mean, p50, p99 = run(rows)
+                print(f"  {label:<52}{mean:>10.3f}{p50:>10.3f}{p99:>10.3f}")
+            if app.monitor is not None:
+                root.handlers = [logger.queue_handler]
+                sampler.rate = sample_rate
+                monitor, app.monitor = app.monitor, None
+                try:
+                    mean, p50, p99 = run(rows)
+                finally:
+                    app.monitor = monitor
+                label = f"async queue, sample={sample_rate}, no drift monitor"
+                print(f"  {label:<52}{mean:>10.3f}{p50:>10.3f}{p99:>10.3f}")
+        finally:
+            root.handlers = [logger.queue_handler]
+            app.request_logger.disabled = False
+            sampler.rate = sample_rate
+            sync_handler.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS)
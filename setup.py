@@ -26,6 +26,6 @@ setup(
     version="0.0.1",
     author="Rakshith",
     author_email="ahrakshith122@gmail.com",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "tests", "tests.*"]),
     install_requires=get_requirements('requirements.txt')
 )
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import platform
+import secrets
+import struct
+import zlib
+from datetime import datetime
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional fast codec
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:  # optional fast codec
+    zstandard = None
+
+
+# Artifact layout (all integers little-endian):
+#
+#   MAGIC | header length (uint32) | JSON header | padding | data section
+#
+# The data section holds the pickle stream followed by every large buffer
+# (NumPy arrays inside the estimators) stored out-of-band with pickle
+# protocol 5.  Each segment starts on an ALIGNMENT boundary so that, when
+# the artifact is not compressed, the buffers can be memory-mapped and
+# handed straight to pickle.loads() without being copied.
+#
+# Only objects that pickle plain NumPy arrays benefit (LinearRegression
+# coef_, KNN training data, ...).  sklearn trees copy their node arrays out
+# of the buffer in Tree.__setstate__, and XGBoost/CatBoost pickle their
+# boosters as in-band bytes, so for those models nothing stays mapped.
+
+MAGIC = b"MLART01\n"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PROTOCOL = 5
+
+# buffers smaller than this stay in-band, a header entry is not worth it
+OUT_OF_BAND_MIN_BYTES = 1024
+
+CODECS = ("none", "zlib", "lz4", "zstd")
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _compress(data, codec, level):
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.compress(data, 1 if level is None else level)
+    if codec == "lz4":
+        if lz4_frame is None:
+            raise ValueError("codec 'lz4' requires the 'lz4' package")
+        return lz4_frame.compress(data, compression_level=0 if level is None else level)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("codec 'zstd' requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    raise ValueError(f"Unknown codec {codec!r}, expected one of {CODECS}")
+
+
+def _decompress(data, codec, raw_length):
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        out = zlib.decompress(data)
+    elif codec == "lz4":
+        if lz4_frame is None:
+            raise ValueError("artifact is lz4 compressed but 'lz4' is not installed")
+        out = lz4_frame.decompress(data)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise ValueError("artifact is zstd compressed but 'zstandard' is not installed")
+        out = zstandard.ZstdDecompressor().decompress(data, max_output_size=raw_length)
+    else:
+        raise ValueError(f"Unknown codec {codec!r} in artifact header")
+    # bytearray keeps the rebuilt arrays writable, like a plain pickle load
+    return bytearray(out)
+
+
+def is_artifact(file_path):
+    with open(file_path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def dump(obj, file_path, compress=None, level=None, metadata=None):
+    """
+    Serialize obj to file_path in the artifact format.
+
+    compress: None/"none" keeps the buffers raw (mmap-able), otherwise one of
+    "zlib", "lz4" or "zstd".  metadata is any JSON-serializable dict stored in
+    the header.  The file is written to a temporary name and moved into place,
+    so readers never observe a half-written artifact.
+    """
+    codec = compress or "none"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}, expected one of {CODECS}")
+
+    buffers = []
+
+    def buffer_callback(buf):
+        if buf.raw().nbytes < OUT_OF_BAND_MIN_BYTES:
+            return True
+        buffers.append(buf)
+        return False
+
+    stream = pickle.dumps(obj, protocol=PROTOCOL, buffer_callback=buffer_callback)
+
+    segments = []
+    offset = 0
+    digest = hashlib.blake2b(digest_size=32)
+    for raw in [memoryview(stream)] + [b.raw() for b in buffers]:
+        data = _compress(raw, codec, level)
+        digest.update(data)
+        segments.append((offset, data, raw.nbytes))
+        offset = _align(offset + len(data))
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "protocol": PROTOCOL,
+        "codec": codec,
+        "checksum": {"algorithm": "blake2b-256", "digest": digest.hexdigest()},
+        "pickle": {"offset": 0, "length": len(segments[0][1]), "raw_length": segments[0][2]},
+        "buffers": [
+            {"offset": off, "length": len(data), "raw_length": raw_length}
+            for off, data, raw_length in segments[1:]
+        ],
+        "object": f"{type(obj).__module__}.{type(obj).__qualname__}",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "metadata": metadata or {},
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+    tmp_path = os.path.join(dir_path, f".tmp-{secrets.token_hex(8)}.pkl")
+    # 0666 like open(), the kernel applies the umask
+    fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            for off, data, _ in segments:
+                f.seek(data_start + off)
+                f.write(data)
+            f.flush()
+            if os.path.exists(file_path):
+                # overwriting keeps the permissions of the previous artifact
+                os.fchmod(f.fileno(), os.stat(file_path).st_mode & 0o777)
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_header(file_obj):
+    """Read and return (header, data_start) from an open artifact file."""
+    if file_obj.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not an artifact file (bad magic)")
+    (header_length,) = struct.unpack("<I", file_obj.read(4))
+    header = json.loads(file_obj.read(header_length).decode("utf-8"))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version {header.get('format_version')}")
+    return header, _align(len(MAGIC) + 4 + header_length)
+
+
+def load(file_path, mmap_mode=None, verify=True):
+    """
+    Load an object written by dump().
+
+    mmap_mode: None reads the file into memory; "r" memory-maps it read-only
+    so uncompressed arrays are views on the page cache (shared between
+    worker processes) instead of copies; "c" maps it copy-on-write.
+    Compressed artifacts are always decompressed into memory.
+    verify: check the payload checksum before unpickling.
+    """
+    if mmap_mode not in (None, "r", "c"):
+        raise ValueError(f"mmap_mode must be None, 'r' or 'c', got {mmap_mode!r}")
+
+    with open(file_path, "rb") as f:
+        header, data_start = read_header(f)
+        if mmap_mode is None:
+            f.seek(data_start)
+            # bytearray so the rebuilt arrays stay writable, as with pickle.load
+            data = bytearray(os.fstat(f.fileno()).st_size - data_start)
+            f.readinto(data)
+            view = memoryview(data)
+        else:
+            access = mmap.ACCESS_READ if mmap_mode == "r" else mmap.ACCESS_COPY
+            # the mapping outlives the file object, arrays keep it alive
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=access))[data_start:]
+
+    codec = header["codec"]
+    segments = [header["pickle"]] + header["buffers"]
+    chunks = [view[s["offset"]:s["offset"] + s["length"]] for s in segments]
+
+    if verify:
+        digest = hashlib.blake2b(digest_size=32)
+        for chunk in chunks:
+            digest.update(chunk)
+        if digest.hexdigest() != header["checksum"]["digest"]:
+            raise ValueError(f"Checksum mismatch, artifact {file_path} is corrupted")
+
+    chunks = [_decompress(c, codec, s["raw_length"]) for c, s in zip(chunks, segments)]
+    return pickle.loads(chunks[0], buffers=chunks[1:])
+
+
+def load_any(file_path, mmap_mode=None, verify=True):
+    """Load an artifact, falling back to a plain pickle for legacy files."""
+    if is_artifact(file_path):
+        return load(file_path, mmap_mode=mmap_mode, verify=verify)
+    with open(file_path, "rb") as f:
+        return pickle.load(f)
+
+
+def inspect(file_path):
+    """Return the header of an artifact without loading the object."""
+    with open(file_path, "rb") as f:
+        return read_header(f)[0]
@@ -19,6 +19,7 @@ from src.exception import CustomException
 from src.logger import logging
 
 from src.utils import save_object,evaluate_models
+from src.monitoring import load_reference_profile,numerical_profile,save_reference_profile
 
 
 from dataclasses import dataclass
@@ -26,6 +27,7 @@ from dataclasses import dataclass
 @dataclass
 class ModelTrainerConfig:
     model_config=os.path.join("artifacts","model_trainer.pkl")
+    reference_profile_file=os.path.join("artifacts","reference_profile.json")
 
 class ModelTrainer:
     def __init__(self):
@@ -104,6 +106,15 @@ class ModelTrainer:
 
             predicted=best_model.predict(X_test)
 
+            # serve-time drift compares live predictions with the model's own
+            # held-out predictions, not with the (wider) target distribution
+            profile_path=self.model_trainer_config.reference_profile_file
+            if os.path.exists(profile_path):
+                profile=load_reference_profile(profile_path)
+                profile["prediction"]=numerical_profile(predicted)
+                save_reference_profile(profile_path,profile)
+                logging.info("prediction reference added to profile")
+
             r2_square=r2_score(predicted,y_test)
 
             return r2_square
@@ -9,6 +9,7 @@ import numpy as np
 from sklearn.preprocessing import OneHotEncoder,StandardScaler
 
 from src.utils import save_object
+from src.monitoring import build_reference_profile,save_reference_profile
 
 
 from src.exception import CustomException
@@ -19,6 +20,7 @@ from dataclasses import dataclass
 @dataclass
 class data_tranformation_config():
     preprocessor_obj_file=os.path.join('artifacts','prepocessor_obj.pkl')
+    reference_profile_file=os.path.join('artifacts','reference_profile.json')
 
 #we create the pipeline here and then use another class to call that
 
@@ -36,6 +38,9 @@ class Data_Transformation():
                 "lunch",
                 "test_preparation_course",
             ]
+            # kept for the reference profile built in initiate_data_transformation
+            self.numerical_columns = numerical_columns
+            self.categorical_columns = categorical_columns
 
             num_pipeline=Pipeline(
                 steps=[
@@ -93,6 +98,14 @@ class Data_Transformation():
 
             )
 
+            # reference for drift monitoring at serve time (src/monitoring.py),
+            # the prediction histogram is added by ModelTrainer
+            save_reference_profile(
+                self.data_transformation_config.reference_profile_file,
+                build_reference_profile(train_df,self.numerical_columns,self.categorical_columns)
+            )
+            logging.info("reference profile saved")
+
             return (
                 train_arr,
                 test_arr,
@@ -4,6 +4,12 @@ from src.logger import logging
 
 def error_message_detail(error, error_detail: sys):
     _, _, exc_tb = error_detail.exc_info()
+    return format_error_message(error, exc_tb)
+
+
+def format_error_message(error, exc_tb):
+    if exc_tb is None:
+        return "Error occured error message[{0}]".format(str(error))
     file_name = exc_tb.tb_frame.f_code.co_filename
     error_message = "Error occured in python script name [{0}] line number [{1}] error message[{2}]".format(
         file_name, exc_tb.tb_lineno, str(error))
@@ -14,10 +20,16 @@ def error_message_detail(error, error_detail: sys):
 class CustomException(Exception):
     def __init__(self, error_message, error_detail: sys):
         super().__init__(error_message)
-        self.error_message = error_message_detail(error_message, error_detail=error_detail)
+        # keep the traceback, the message is only built when it is read
+        self._error = error_message
+        self._exc_tb = error_detail.exc_info()[2]
+        self._error_message = None
+
+    @property
+    def error_message(self):
+        if self._error_message is None:
+            self._error_message = format_error_message(self._error, self._exc_tb)
+        return self._error_message
 
     def __str__(self):
         return self.error_message
-
-
-
@@ -1,5 +1,11 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 from datetime import datetime
 
 LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
@@ -8,8 +14,95 @@ os.makedirs(logs_path,exist_ok=True)
 
 LOG_FILE_PATH=os.path.join(logs_path,LOG_FILE)
 
+# fraction of per-request records (logger "request") that are kept,
+# WARNING and above are always kept
+LOG_SAMPLE_RATE=float(os.getenv("LOG_SAMPLE_RATE","0.1"))
+
+# attributes every LogRecord has, anything else came in through extra=
+_RESERVED=set(vars(logging.makeLogRecord({}))) | {"message","asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, extra= fields are kept as top level keys."""
+
+    def format(self, record):
+        entry={
+            "time":datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level":record.levelname,
+            "logger":record.name,
+            "module":record.module,
+            "line":record.lineno,
+            "message":record.getMessage(),
+        }
+        for key,value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key]=value
+        # tracebacks are formatted here, on the listener thread
+        if record.exc_info:
+            entry["exception"]=self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"]=record.exc_text
+        if record.stack_info:
+            entry["stack"]=self.formatStack(record.stack_info)
+        return json.dumps(entry,default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() formats the whole record, traceback included, on the
+    calling thread. Only merge the message arguments here and leave exc_info to
+    the formatter running behind the queue.
+    """
+
+    def prepare(self, record):
+        record=copy.copy(record)
+        record.msg=record.getMessage()
+        record.args=None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of records below WARNING."""
+
+    def __init__(self, rate, name=""):
+        super().__init__(name)
+        self.rate=rate
+
+    def filter(self, record):
+        return record.levelno>=logging.WARNING or random.random()<self.rate
+
+
+def _start_listener():
+    file_handler=logging.FileHandler(LOG_FILE_PATH)
+    file_handler.setFormatter(JsonFormatter())
+    listener=logging.handlers.QueueListener(log_queue,file_handler,respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _stop_listener():
+    if listener._thread is not None:
+        listener.stop()
+
+
+def _restart_after_fork():
+    # the listener thread does not survive fork (gunicorn --preload)
+    global log_queue,listener
+    log_queue=queue.SimpleQueue()
+    queue_handler.queue=log_queue
+    listener=_start_listener()
+
+
+log_queue=queue.SimpleQueue()
+queue_handler=LazyQueueHandler(log_queue)
+
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
+    handlers=[queue_handler],
     level=logging.INFO,
-)
\ No newline at end of file
+)
+
+listener=_start_listener()
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+logging.getLogger("request").addFilter(SamplingFilter(LOG_SAMPLE_RATE))
@@ -0,0 +1,385 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+
+# Streaming input drift / data quality monitoring.
+#
+# A reference profile (category frequencies, quantile bin edges and bin counts)
+# is computed from the training data by build_reference_profile().  At serve
+# time every worker keeps a Sketch of the same shape; updating it is a few dict
+# increments and a bisect per row.  A background thread periodically writes the
+# worker's sketch to MONITOR_DIR, and report() merges all worker snapshots and
+# compares them with the reference (PSI for every column, binned KS for
+# numerical ones, unknown and missing rates).  Snapshots are written under
+# MONITOR_DIR/<profile fingerprint>/, so workers serving different model
+# versions (e.g. during a rolling deploy) never merge or delete each other's.
+
+OTHER = "__other__"
+
+# distinct unseen category values tracked per column before lumping into OTHER
+MAX_UNKNOWN_VALUES = 100
+
+PSI_EPSILON = 1e-4
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+
+QUANTILES = [i / 10 for i in range(1, 10)]
+
+
+def numerical_profile(values):
+    """Decile bin edges and bin counts of a numeric column or prediction array."""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    edges = sorted(set(np.quantile(values, QUANTILES).tolist()))
+    counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    return {"type": "numerical", "edges": edges, "counts": counts.tolist()}
+
+
+def build_reference_profile(df, numerical_columns, categorical_columns):
+    """
+    Profile the training features. The "prediction" entry is added by the
+    trainer from the chosen model's predictions, see numerical_profile().
+    """
+    features = {}
+    for column in categorical_columns:
+        counts = df[column].dropna().astype(str).value_counts()
+        features[column] = {"type": "categorical", "counts": {k: int(v) for k, v in counts.items()}}
+    for column in numerical_columns:
+        features[column] = numerical_profile(df[column])
+
+    return {"rows": int(len(df)), "features": features}
+
+
+def profile_fingerprint(profile):
+    """Hash of the buckets (categories and bin edges) a sketch is counted in."""
+    layout = {
+        column: sorted(ref["counts"]) if ref["type"] == "categorical" else ref["edges"]
+        for column, ref in profile["features"].items()
+    }
+    if "prediction" in profile:
+        layout["__prediction__"] = profile["prediction"]["edges"]
+    return hashlib.sha256(json.dumps(layout, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def save_reference_profile(file_path, profile):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_reference_profile(file_path):
+    with open(file_path) as f:
+        return json.load(f)
+
+
+class Sketch:
+    """Mergeable counts for one stream of rows, laid out like the reference profile."""
+
+    def __init__(self, profile):
+        self.fingerprint = profile_fingerprint(profile)
+        self.rows = 0
+        self.columns = {}
+        for column, ref in profile["features"].items():
+            self.columns[column] = self._empty(ref)
+        self.prediction = self._empty(profile["prediction"]) if "prediction" in profile else None
+
+    @staticmethod
+    def _empty(ref):
+        if ref["type"] == "categorical":
+            return {"counts": {}, "unknown": {}, "missing": 0}
+        return {"counts": [0] * (len(ref["edges"]) + 1), "missing": 0}
+
+    @staticmethod
+    def _add_category(state, known, value):
+        if value is None:
+            state["missing"] += 1
+            return
+        value = str(value)
+        if value in known:
+            state["counts"][value] = state["counts"].get(value, 0) + 1
+            return
+        unknown = state["unknown"]
+        if value not in unknown and len(unknown) >= MAX_UNKNOWN_VALUES:
+            value = OTHER
+        unknown[value] = unknown.get(value, 0) + 1
+
+    @staticmethod
+    def _add_number(state, edges, value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = math.nan
+        if math.isnan(value):
+            state["missing"] += 1
+            return
+        state["counts"][bisect_right(edges, value)] += 1
+
+    def merge(self, other):
+        """Add a to_dict() snapshot, ValueError if it was built from another profile."""
+        if other.get("fingerprint") != self.fingerprint:
+            raise ValueError("snapshot was counted against a different reference profile")
+        pairs = [(mine, other["columns"].get(column)) for column, mine in self.columns.items()]
+        if self.prediction is not None:
+            pairs.append((self.prediction, other.get("prediction")))
+        for mine, theirs in pairs:
+            if theirs is None or type(mine["counts"]) is not type(theirs["counts"]):
+                raise ValueError("snapshot does not match the sketch layout")
+            if isinstance(mine["counts"], list) and len(mine["counts"]) != len(theirs["counts"]):
+                raise ValueError("snapshot histogram has a different number of bins")
+
+        self.rows += other["rows"]
+        for mine, theirs in pairs:
+            mine["missing"] += theirs["missing"]
+            if isinstance(mine["counts"], dict):
+                for key in ("counts", "unknown"):
+                    for value, n in theirs[key].items():
+                        mine[key][value] = mine[key].get(value, 0) + n
+            else:
+                mine["counts"] = [a + b for a, b in zip(mine["counts"], theirs["counts"])]
+        return self
+
+    def to_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "rows": self.rows,
+            "columns": self.columns,
+            "prediction": self.prediction,
+        }
+
+
+def psi(expected, actual):
+    """Population stability index of two count vectors over the same buckets."""
+    e_total, a_total = sum(expected), sum(actual)
+    if not e_total or not a_total:
+        return None
+    score = 0.0
+    for e, a in zip(expected, actual):
+        e = max(e / e_total, PSI_EPSILON)
+        a = max(a / a_total, PSI_EPSILON)
+        score += (a - e) * math.log(a / e)
+    return score
+
+
+def binned_ks(expected, actual):
+    """Kolmogorov-Smirnov statistic evaluated at the reference bin edges."""
+    e_total, a_total = sum(expected), sum(actual)
+    if not e_total or not a_total:
+        return None
+    e_cdf = a_cdf = stat = 0.0
+    for e, a in zip(expected, actual):
+        e_cdf += e / e_total
+        a_cdf += a / a_total
+        stat = max(stat, abs(e_cdf - a_cdf))
+    return stat
+
+
+def _status(score):
+    if score is None:
+        return "no_data"
+    if score >= PSI_ALERT:
+        return "alert"
+    if score >= PSI_WARN:
+        return "warn"
+    return "ok"
+
+
+def compare(profile, sketch):
+    """Drift report for a merged sketch against the reference profile."""
+
+    def column_report(ref, live):
+        observed = sum(live["counts"].values()) if isinstance(live["counts"], dict) else sum(live["counts"])
+        if ref["type"] == "categorical":
+            categories = list(ref["counts"])
+            unknown = sum(live["unknown"].values())
+            observed += unknown
+            score = psi(
+                [ref["counts"][c] for c in categories] + [0],
+                [live["counts"].get(c, 0) for c in categories] + [unknown],
+            )
+            result = {
+                "psi": score,
+                "unknown_rate": unknown / observed if observed else None,
+                "unknown_values": dict(sorted(live["unknown"].items(), key=lambda kv: -kv[1])[:10]),
+            }
+        else:
+            result = {
+                "psi": psi(ref["counts"], live["counts"]),
+                "ks": binned_ks(ref["counts"], live["counts"]),
+            }
+        total = observed + live["missing"]
+        result["missing_rate"] = live["missing"] / total if total else None
+        result["status"] = _status(result["psi"])
+        return result
+
+    report = {
+        "rows": sketch.rows,
+        "features": {
+            column: column_report(profile["features"][column], live)
+            for column, live in sketch.columns.items()
+        },
+    }
+    if sketch.prediction is not None:
+        report["prediction"] = column_report(profile["prediction"], sketch.prediction)
+    return report
+
+
+class DriftMonitor:
+    """
+    Per-worker monitor. observe() only touches the in-memory sketch; a daemon
+    thread writes it to snapshot_dir every flush_interval seconds so that
+    report() can merge the sketches of all gunicorn workers on the same
+    profile. Snapshots not rewritten for retention seconds (dead workers,
+    earlier deployments) are deleted when a report is built.
+    """
+
+    def __init__(self, profile, feature_names, snapshot_dir, flush_interval=30.0, retention=86400.0):
+        self.profile = profile
+        self.fingerprint = profile_fingerprint(profile)
+        self.feature_names = feature_names
+        self.snapshot_dir = snapshot_dir
+        # one directory per profile, other model versions are left alone
+        self.profile_dir = os.path.join(snapshot_dir, self.fingerprint)
+        self.flush_interval = flush_interval
+        self.retention = retention
+        # (column index, sketch key, add function, reference) for every monitored feature
+        self._plan = []
+        for i, name in enumerate(feature_names):
+            ref = profile["features"].get(name)
+            if ref is None:
+                continue
+            if ref["type"] == "categorical":
+                self._plan.append((i, name, Sketch._add_category, set(ref["counts"])))
+            else:
+                self._plan.append((i, name, Sketch._add_number, ref["edges"]))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = None
+        self._snapshot_name = None
+        self._sketch = None
+
+    @classmethod
+    def from_file(cls, profile_path, feature_names, snapshot_dir, flush_interval=30.0, retention=86400.0):
+        return cls(load_reference_profile(profile_path), feature_names, snapshot_dir, flush_interval, retention)
+
+    def _ensure_worker(self):
+        # the sketch and flush thread are per process, set up lazily after fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._sketch = Sketch(self.profile)
+            # pid plus start time, pids get reused across restarts
+            self._snapshot_name = f"worker-{os.getpid()}-{time.time_ns()}.json"
+            self._pid = os.getpid()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            threading.Thread(target=self._flush_loop, name="drift-monitor-flush", daemon=True).start()
+
+    def observe(self, rows):
+        """Count a batch of feature rows (lists ordered like feature_names)."""
+        self._ensure_worker()
+        with self._lock:
+            columns = self._sketch.columns
+            for row in rows:
+                for i, name, add, ref in self._plan:
+                    add(columns[name], ref, row[i])
+            self._sketch.rows += len(rows)
+
+    def observe_predictions(self, predictions):
+        self._ensure_worker()
+        if self._sketch.prediction is None:
+            return
+        edges = self.profile["prediction"]["edges"]
+        with self._lock:
+            for value in predictions:
+                Sketch._add_number(self._sketch.prediction, edges, value)
+
+    def flush(self):
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            payload = json.dumps(self._sketch.to_dict())
+        # the flush thread and report requests may flush at the same time
+        with self._flush_lock:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.profile_dir, prefix=".tmp-", suffix=".json")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(payload)
+                os.replace(tmp_path, os.path.join(self.profile_dir, self._snapshot_name))
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _snapshots(directory):
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        return [
+            os.path.join(directory, name)
+            for name in names
+            if name.startswith("worker-") and name.endswith(".json")
+        ]
+
+    def _sweep(self):
+        """Delete snapshots of any profile not rewritten within the retention window."""
+        now = time.time()
+        try:
+            entries = os.listdir(self.snapshot_dir)
+        except OSError:
+            return
+        for entry in entries:
+            directory = os.path.join(self.snapshot_dir, entry)
+            if not os.path.isdir(directory):
+                continue
+            for path in self._snapshots(directory):
+                try:
+                    if now - os.path.getmtime(path) > self.retention:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def merged(self):
+        """Merge the snapshots of every worker on this profile, this one taken live."""
+        try:
+            self.flush()
+        except OSError:
+            pass  # the previous snapshot of this worker is still merged
+        self._sweep()
+        sketch = Sketch(self.profile)
+        for path in self._snapshots(self.profile_dir):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # skipped, not deleted: the retention sweep removes it once stale
+            if not isinstance(snapshot, dict) or snapshot.get("fingerprint") != sketch.fingerprint:
+                continue
+            try:
+                sketch.merge(snapshot)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return sketch
+
+    def report(self):
+        return compare(self.profile, self.merged())
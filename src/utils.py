@@ -4,21 +4,21 @@ import sys
 import numpy as np
 import pandas as pd
 import dill
-import pickle
 from sklearn.metrics import r2_score
 from sklearn.model_selection import GridSearchCV
 
+from src import artifact
 from src.exception import CustomException
 
 
-def save_object(file_path, obj):
+def save_object(file_path, obj, compress=None, metadata=None):
     try:
         dir_path = os.path.dirname(file_path)
 
         os.makedirs(dir_path, exist_ok=True)
 
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+        # arrays are stored out-of-band so load_object can memory-map them
+        artifact.dump(obj, file_path, compress=compress, metadata=metadata)
 
     except Exception as e:
         raise CustomException(e, sys)
@@ -56,10 +56,10 @@ def evaluate_models(X_train, y_train, X_test, y_test, models, param):
         raise CustomException(e, sys)
 
 
-def load_object(file_path):
+def load_object(file_path, mmap_mode=None):
     try:
-        with open(file_path, "rb") as file_obj:
-            return pickle.load(file_obj)
+        # plain pickles written before the artifact format still load
+        return artifact.load_any(file_path, mmap_mode=mmap_mode)
 
     except Exception as e:
         raise CustomException(e, sys)
\ No newline at end of file
@@ -0,0 +1,116 @@
+import os
+import pickle
+
+import pytest
+
+from src import artifact
+
+
+class Blob:
+    """Stand-in for an array: its buffer goes out-of-band with protocol 5."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return Blob, (pickle.PickleBuffer(self.data),)
+        return Blob, (bytes(self.data),)
+
+    def __eq__(self, other):
+        return bytes(self.data) == bytes(other.data)
+
+
+CODECS = ["none", "zlib"]
+if artifact.lz4_frame is not None:
+    CODECS.append("lz4")
+if artifact.zstandard is not None:
+    CODECS.append("zstd")
+
+
+def sample_object():
+    return {
+        "large": Blob(bytearray(b"x" * 5000)),
+        "small": Blob(bytearray(b"y" * 10)),
+        "other": Blob(bytearray(range(256)) * 40),
+        "params": {"alpha": 0.5, "name": "model"},
+    }
+
+
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("mmap_mode", [None, "r", "c"])
+def test_round_trip(tmp_path, codec, mmap_mode):
+    path = tmp_path / "obj.pkl"
+    obj = sample_object()
+    artifact.dump(obj, path, compress=codec, metadata={"run": 1})
+
+    assert artifact.load(path, mmap_mode=mmap_mode) == obj
+    header = artifact.inspect(path)
+    assert header["codec"] == codec
+    assert header["metadata"] == {"run": 1}
+    # the small buffer stays in-band
+    assert len(header["buffers"]) == 2
+
+
+def test_buffers_are_aligned(tmp_path):
+    path = tmp_path / "obj.pkl"
+    artifact.dump(sample_object(), path)
+    for segment in artifact.inspect(path)["buffers"]:
+        assert segment["offset"] % artifact.ALIGNMENT == 0
+
+
+@pytest.mark.parametrize("mmap_mode,writable", [(None, True), ("r", False), ("c", True)])
+def test_numpy_arrays_writability(tmp_path, mmap_mode, writable):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "arr.pkl"
+    arr = np.arange(10000, dtype=np.float64)
+    artifact.dump({"coef": arr}, path)
+
+    loaded = artifact.load(path, mmap_mode=mmap_mode)["coef"]
+    np.testing.assert_array_equal(loaded, arr)
+    assert loaded.flags.writeable is writable
+
+
+def test_corrupted_payload_fails_checksum(tmp_path):
+    path = tmp_path / "obj.pkl"
+    artifact.dump(sample_object(), path)
+    data = bytearray(path.read_bytes())
+    data[-10] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        artifact.load(path)
+
+
+def test_load_any_reads_plain_pickle(tmp_path):
+    path = tmp_path / "legacy.pkl"
+    obj = {"a": [1, 2, 3]}
+    with open(path, "wb") as f:
+        pickle.dump(obj, f)
+
+    assert not artifact.is_artifact(path)
+    assert artifact.load_any(path) == obj
+
+
+def test_dump_uses_umask_mode(tmp_path):
+    path = tmp_path / "obj.pkl"
+    umask = os.umask(0o022)
+    try:
+        artifact.dump(sample_object(), path)
+    finally:
+        os.umask(umask)
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    assert [p.name for p in tmp_path.iterdir()] == ["obj.pkl"]
+
+
+def test_unknown_codec(tmp_path):
+    with pytest.raises(ValueError, match="Unknown codec"):
+        artifact.dump(sample_object(), tmp_path / "obj.pkl", compress="brotli")
+
+
+def test_overwrite_keeps_existing_mode(tmp_path):
+    path = tmp_path / "obj.pkl"
+    artifact.dump(sample_object(), path)
+    os.chmod(path, 0o640)
+    artifact.dump(sample_object(), path)
+    assert os.stat(path).st_mode & 0o777 == 0o640
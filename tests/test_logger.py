@@ -0,0 +1,88 @@
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+from src.exception import CustomException
+from src.logger import JsonFormatter, LazyQueueHandler, SamplingFilter
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",), exc_info=None, **kwargs):
+    return logging.getLogger("test").makeRecord(
+        "test", level, __file__, 10, msg, args, exc_info, extra=kwargs.pop("extra", None), **kwargs
+    )
+
+
+def current_exc_info():
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        return sys.exc_info()
+
+
+def test_sampling_filter_keeps_warnings():
+    sampler = SamplingFilter(0.0)
+    assert sampler.filter(make_record(logging.WARNING))
+    assert sampler.filter(make_record(logging.ERROR))
+    assert not sampler.filter(make_record(logging.INFO))
+
+
+def test_sampling_filter_keeps_about_rate():
+    sampler = SamplingFilter(0.25)
+    kept = sum(sampler.filter(make_record()) for _ in range(20000))
+    assert kept == pytest.approx(5000, rel=0.1)
+
+
+def test_queue_handler_prepare_is_lazy():
+    handler = LazyQueueHandler(queue.SimpleQueue())
+    handler.setFormatter(JsonFormatter())
+    record = make_record(exc_info=current_exc_info())
+
+    prepared = handler.prepare(record)
+    assert prepared.msg == "hello world"
+    assert prepared.args is None
+    assert prepared.exc_info is record.exc_info
+    # the traceback is left for the listener thread
+    assert prepared.exc_text is None
+    assert record.exc_text is None
+
+
+def test_json_formatter_fields():
+    record = make_record(
+        extra={"rows": 3, "latency_ms": 1.5},
+        exc_info=current_exc_info(),
+        sinfo="Stack (most recent call last):\n  frame",
+    )
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "test"
+    assert entry["rows"] == 3
+    assert entry["latency_ms"] == 1.5
+    assert "ZeroDivisionError" in entry["exception"]
+    assert entry["stack"].startswith("Stack (most recent call last)")
+
+
+def test_custom_exception_message_is_lazy():
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError as e:
+            raise CustomException(e, sys)
+    except CustomException as ce:
+        error = ce
+
+    assert error._error_message is None
+    message = str(error)
+    assert "division by zero" in message
+    assert "line number" in message
+    assert error._error_message is message
+
+
+def test_custom_exception_without_traceback():
+    # raised outside an except block, sys.exc_info() has no traceback
+    error = CustomException("boom", sys)
+    assert str(error) == "Error occured error message[boom]"
@@ -0,0 +1,182 @@
+import json
+import math
+import os
+import threading
+import time
+
+import pytest
+
+from src import monitoring
+from src.monitoring import DriftMonitor, Sketch, binned_ks, psi
+
+FEATURES = ["gender", "reading_score"]
+
+
+def make_profile(edges=(50, 60, 70)):
+    edges = list(edges)
+    return {
+        "rows": 10,
+        "features": {
+            "gender": {"type": "categorical", "counts": {"female": 5, "male": 5}},
+            "reading_score": {"type": "numerical", "edges": edges, "counts": [1] * (len(edges) + 1)},
+        },
+        "prediction": {"type": "numerical", "edges": edges, "counts": [1] * (len(edges) + 1)},
+    }
+
+
+def make_monitor(tmp_path, profile=None, **kwargs):
+    kwargs.setdefault("flush_interval", 3600)
+    return DriftMonitor(profile or make_profile(), FEATURES, str(tmp_path), **kwargs)
+
+
+def test_psi_and_ks_known_values():
+    assert psi([1, 1], [1, 1]) == 0.0
+    assert psi([50, 50], [90, 10]) == pytest.approx(0.4 * math.log(9), rel=1e-9)
+    assert psi([0, 0], [1, 1]) is None
+
+    assert binned_ks([1, 1, 1, 1], [1, 1, 1, 1]) == pytest.approx(0.0)
+    assert binned_ks([1, 1, 1, 1], [4, 0, 0, 0]) == pytest.approx(0.75)
+    assert binned_ks([1, 1], [0, 0]) is None
+
+
+def test_sketch_merge_adds_counts():
+    profile = make_profile()
+    a, b = Sketch(profile), Sketch(profile)
+    Sketch._add_category(a.columns["gender"], {"female", "male"}, "female")
+    Sketch._add_category(b.columns["gender"], {"female", "male"}, "female")
+    Sketch._add_category(b.columns["gender"], {"female", "male"}, "other")
+    Sketch._add_number(a.columns["reading_score"], [50, 60, 70], 55)
+    Sketch._add_number(b.columns["reading_score"], [50, 60, 70], "bad")
+    a.rows, b.rows = 1, 2
+
+    a.merge(b.to_dict())
+    assert a.rows == 3
+    assert a.columns["gender"] == {"counts": {"female": 2}, "unknown": {"other": 1}, "missing": 0}
+    assert a.columns["reading_score"] == {"counts": [0, 1, 0, 0], "missing": 1}
+
+
+def test_sketch_merge_rejects_other_profile():
+    sketch = Sketch(make_profile())
+    other = Sketch(make_profile(edges=(40, 80))).to_dict()
+    with pytest.raises(ValueError):
+        sketch.merge(other)
+    # same fingerprint but a truncated histogram
+    bad = Sketch(make_profile()).to_dict()
+    bad["columns"]["reading_score"]["counts"] = [1, 1]
+    with pytest.raises(ValueError):
+        sketch.merge(bad)
+    assert sketch.rows == 0
+
+
+def test_unknown_values_are_capped():
+    state = Sketch(make_profile()).columns["gender"]
+    for i in range(monitoring.MAX_UNKNOWN_VALUES + 5):
+        Sketch._add_category(state, {"female", "male"}, f"value-{i}")
+    Sketch._add_category(state, {"female", "male"}, "value-0")
+
+    assert len(state["unknown"]) == monitoring.MAX_UNKNOWN_VALUES + 1
+    assert state["unknown"][monitoring.OTHER] == 5
+    assert state["unknown"]["value-0"] == 2
+
+
+def snapshot_files(monitor):
+    return sorted(n for n in os.listdir(monitor.profile_dir) if n.startswith("worker-"))
+
+
+def test_observe_flush_report_round_trip(tmp_path):
+    monitor = make_monitor(tmp_path)
+    monitor.observe([["female", 55], ["other", "80"], [None, "bad"], ["male", 40]] * 25)
+    monitor.observe_predictions([55, 65, 75, 45])
+
+    report = monitor.report()
+    assert report["rows"] == 100
+    gender = report["features"]["gender"]
+    assert gender["unknown_rate"] == pytest.approx(25 / 75)
+    assert gender["unknown_values"] == {"other": 25}
+    assert gender["missing_rate"] == pytest.approx(0.25)
+    assert report["features"]["reading_score"]["status"] == "alert"
+    assert report["prediction"]["psi"] == pytest.approx(0.0)
+    assert len(snapshot_files(monitor)) == 1
+    assert monitor.profile_dir == os.path.join(str(tmp_path), monitor.fingerprint)
+
+
+def test_report_merges_other_workers(tmp_path):
+    profile = make_profile()
+    monitor = make_monitor(tmp_path, profile)
+    monitor.observe([["female", 55]])
+
+    other = Sketch(profile)
+    other.rows = 7
+    with open(os.path.join(monitor.profile_dir, "worker-1-1.json"), "w") as f:
+        json.dump(other.to_dict(), f)
+
+    assert monitor.report()["rows"] == 8
+
+
+def test_profiles_do_not_touch_each_other(tmp_path):
+    # a rolling deploy: old and new model versions share MONITOR_DIR
+    old = make_monitor(tmp_path, make_profile(edges=(40, 80)))
+    new = make_monitor(tmp_path, make_profile())
+    old.observe([["female", 55]] * 3)
+    new.observe([["male", 65]] * 5)
+
+    for _ in range(2):
+        assert old.report()["rows"] == 3
+        assert new.report()["rows"] == 5
+    assert len(snapshot_files(old)) == 1
+    assert len(snapshot_files(new)) == 1
+
+
+def test_report_skips_mismatched_and_sweeps_stale_snapshots(tmp_path):
+    monitor = make_monitor(tmp_path, retention=3600)
+    monitor.observe([["female", 55]])
+
+    # wrong fingerprint or no fingerprint (written before they existed)
+    mismatched = Sketch(make_profile(edges=(40, 80))).to_dict()
+    mismatched["rows"] = 1000
+    with open(os.path.join(monitor.profile_dir, "worker-1-1.json"), "w") as f:
+        json.dump(mismatched, f)
+    with open(os.path.join(monitor.profile_dir, "worker-2-1.json"), "w") as f:
+        json.dump({"rows": 5, "columns": {}}, f)
+
+    # stale snapshots, in this profile and in an earlier one
+    past = time.time() - 7200
+    stale = Sketch(make_profile()).to_dict()
+    stale["rows"] = 500
+    stale_path = os.path.join(monitor.profile_dir, "worker-3-1.json")
+    with open(stale_path, "w") as f:
+        json.dump(stale, f)
+    old_dir = tmp_path / "0123456789abcdef"
+    old_dir.mkdir()
+    old_path = old_dir / "worker-4-1.json"
+    old_path.write_text(json.dumps(mismatched))
+    for path in (stale_path, old_path):
+        os.utime(path, (past, past))
+
+    assert monitor.report()["rows"] == 1
+    # mismatched snapshots are only skipped, stale ones are deleted
+    assert len(snapshot_files(monitor)) == 3
+    assert not os.path.exists(stale_path)
+    assert list(old_dir.iterdir()) == []
+
+
+def test_concurrent_reports(tmp_path):
+    monitor = make_monitor(tmp_path)
+    monitor.observe([["female", 55]])
+    errors = []
+
+    def run():
+        try:
+            for _ in range(50):
+                monitor.report()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert [n for n in os.listdir(monitor.profile_dir) if n.startswith(".tmp-")] == []